@@ -1 +1 @@
-from agno.memory.db.base import MemoryDb
+from agno.memory.v2.db.base import MemoryDb
@@ -25,10 +25,24 @@ class MemoryDb(ABC):
     def upsert_memory(self, memory: MemoryRow) -> Optional[MemoryRow]:
         raise NotImplementedError
 
+    def upsert_memories(self, memories: List[MemoryRow]) -> None:
+        """Upsert several memories. Databases that can write them in one round trip should override this."""
+        for memory in memories:
+            self.upsert_memory(memory)
+
     @abstractmethod
     def delete_memory(self, memory_id: str) -> None:
         raise NotImplementedError
 
+    def delete_memories(self, memory_ids: List[str]) -> None:
+        """Delete several memories. Databases that can delete them in one round trip should override this."""
+        for memory_id in memory_ids:
+            self.delete_memory(memory_id)
+
+    def supports_threaded_writes(self) -> bool:
+        """Whether memories can be written from a thread other than the caller's, e.g. while a model is generating."""
+        return True
+
     @abstractmethod
     def drop_table(self) -> None:
         raise NotImplementedError
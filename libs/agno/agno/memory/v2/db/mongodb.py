@@ -2,14 +2,14 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 try:
-    from pymongo import MongoClient
+    from pymongo import MongoClient, UpdateOne
     from pymongo.collection import Collection
     from pymongo.database import Database
     from pymongo.errors import PyMongoError
 except ImportError:
     raise ImportError("`pymongo` not installed. Please install it with `pip install pymongo`")
 
-from agno.memory.v2.db import MemoryDb
+from agno.memory.v2.db.base import MemoryDb
 from agno.memory.v2.db.schema import MemoryRow
 from agno.utils.log import log_debug, logger
 
@@ -149,6 +149,42 @@ class MongoMemoryDb(MemoryDb):
             logger.error(f"Error upserting memory: {e}")
             raise
 
+    def upsert_memories(self, memories: List[MemoryRow]) -> None:
+        """Upsert several memories into the collection with a single bulk write
+        Args:
+            memories: MemoryRows to upsert
+        Returns:
+            None
+        """
+        if len(memories) == 0:
+            return
+        try:
+            timestamp = int(datetime.now(timezone.utc).timestamp())
+            operations = [
+                UpdateOne(
+                    {"id": memory.id},
+                    {
+                        "$set": {
+                            "user_id": memory.user_id,
+                            "memory": memory.memory,
+                            "updated_at": timestamp,
+                            "_version": 1,
+                        },
+                        "$setOnInsert": {"created_at": timestamp},
+                    },
+                    upsert=True,
+                )
+                for memory in memories
+            ]
+            result = self.collection.bulk_write(operations, ordered=True)
+
+            if not result.acknowledged:
+                logger.error("Memory upsert not acknowledged")
+
+        except PyMongoError as e:
+            logger.error(f"Error upserting memories: {e}")
+            raise
+
     def delete_memory(self, memory_id: str) -> None:
         """Delete a memory from the collection
         Args:
@@ -166,6 +202,20 @@ class MongoMemoryDb(MemoryDb):
             logger.error(f"Error deleting memory: {e}")
             raise
 
+    def delete_memories(self, memory_ids: List[str]) -> None:
+        """Delete several memories from the collection
+        Args:
+            memory_ids: IDs of the memories to delete
+        Returns:
+            None
+        """
+        try:
+            result = self.collection.delete_many({"id": {"$in": memory_ids}})
+            log_debug(f"Successfully deleted {result.deleted_count} memories")
+        except PyMongoError as e:
+            logger.error(f"Error deleting memories: {e}")
+            raise
+
     def drop_table(self) -> None:
         """Drop the collection
         Returns:
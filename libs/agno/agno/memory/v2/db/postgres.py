@@ -152,11 +152,49 @@ class PostgresMemoryDb(MemoryDb):
                 return self.upsert_memory(memory, create_and_retry=False)
             return None
 
+    def upsert_memories(self, memories: List[MemoryRow], create_and_retry: bool = True) -> None:
+        """Create or update several memories with a single statement"""
+        if len(memories) == 0:
+            return None
+
+        # A statement cannot upsert the same row twice, so only the last version of each memory is kept
+        latest_memories = {memory.id: memory for memory in memories}
+        try:
+            with self.Session() as sess, sess.begin():
+                stmt = postgresql.insert(self.table).values(
+                    [
+                        dict(id=memory.id, user_id=memory.user_id, memory=memory.memory)
+                        for memory in latest_memories.values()
+                    ]
+                )
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["id"],
+                    set_=dict(
+                        user_id=stmt.excluded.user_id,
+                        memory=stmt.excluded.memory,
+                    ),
+                )
+
+                sess.execute(stmt)
+        except Exception as e:
+            log_debug(f"Exception upserting into table: {e}")
+            log_debug(f"Table does not exist: {self.table.name}")
+            log_debug("Creating table for future transactions")
+            self.create()
+            if create_and_retry:
+                return self.upsert_memories(memories, create_and_retry=False)
+            return None
+
     def delete_memory(self, memory_id: str) -> None:
         with self.Session() as sess, sess.begin():
             stmt = delete(self.table).where(self.table.c.id == memory_id)
             sess.execute(stmt)
 
+    def delete_memories(self, memory_ids: List[str]) -> None:
+        with self.Session() as sess, sess.begin():
+            stmt = delete(self.table).where(self.table.c.id.in_(memory_ids))
+            sess.execute(stmt)
+
     def drop_table(self) -> None:
         if self.table_exists():
             log_debug(f"Deleting table: {self.table_name}")
@@ -177,12 +177,55 @@ class SqliteMemoryDb(MemoryDb):
             else:
                 raise
 
+    def upsert_memories(self, memories: List[MemoryRow], create_and_retry: bool = True) -> None:
+        """Upsert several memories in a single transaction"""
+        try:
+            with self.Session() as session:
+                for memory in memories:
+                    existing = session.execute(select(self.table).where(self.table.c.id == memory.id)).first()
+
+                    if existing:
+                        stmt = (
+                            self.table.update()
+                            .where(self.table.c.id == memory.id)
+                            .values(
+                                user_id=memory.user_id, memory=str(memory.memory), updated_at=text("CURRENT_TIMESTAMP")
+                            )
+                        )
+                    else:
+                        stmt = self.table.insert().values(  # type: ignore
+                            id=memory.id, user_id=memory.user_id, memory=str(memory.memory)
+                        )
+
+                    session.execute(stmt)
+                session.commit()
+        except SQLAlchemyError as e:
+            logger.error(f"Exception upserting into table: {e}")
+            if not self.table_exists():
+                log_info(f"Table does not exist: {self.table_name}")
+                log_info("Creating table for future transactions")
+                self.create()
+                if create_and_retry:
+                    return self.upsert_memories(memories, create_and_retry=False)
+            else:
+                raise
+
     def delete_memory(self, memory_id: str) -> None:
         with self.Session() as session:
             stmt = delete(self.table).where(self.table.c.id == memory_id)
             session.execute(stmt)
             session.commit()
 
+    def delete_memories(self, memory_ids: List[str]) -> None:
+        with self.Session() as session:
+            stmt = delete(self.table).where(self.table.c.id.in_(memory_ids))
+            session.execute(stmt)
+            session.commit()
+
+    def supports_threaded_writes(self) -> bool:
+        # Each thread gets its own connection to an in-memory database, and with it its own empty database
+        return self.db_engine.url.database not in (None, "", ":memory:")
+
     def drop_table(self) -> None:
         if self.table_exists():
             log_debug(f"Deleting table: {self.table_name}")
@@ -1,14 +1,463 @@
-from copy import deepcopy
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, cast
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from io import StringIO
+from os import getenv
+from threading import Lock
+from types import CodeType
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from pydantic import BaseModel, Field, validate_call
 
 from agno.memory.v2.db.base import MemoryDb
 from agno.memory.v2.db.schema import MemoryRow
-from agno.memory.v2.schema import UserMemory
 from agno.models.base import Model
 from agno.models.message import Message
+from agno.models.response import ModelResponse, ModelResponseEvent
 from agno.tools.function import Function
 from agno.utils.log import log_debug, log_error, log_warning
+from agno.utils.prompts import get_json_output_prompt
+from agno.utils.string import parse_response_model_str
+
+
+class MemoryToAdd(BaseModel):
+    """A new memory to add for the user."""
+
+    memory: str = Field(..., description="The memory to be added.")
+    topics: Optional[List[str]] = Field(
+        None, description='The topics of the memory (e.g. ["name", "hobbies", "location"]).'
+    )
+
+
+class MemoryToUpdate(BaseModel):
+    """An existing memory of the user to update."""
+
+    memory_id: str = Field(..., description="The id of the memory to be updated.")
+    memory: str = Field(..., description="The updated memory.")
+    topics: Optional[List[str]] = Field(
+        None, description='The topics of the memory (e.g. ["name", "hobbies", "location"]).'
+    )
+
+
+class MemoryOps(BaseModel):
+    """The changes to make to the user's memories."""
+
+    add: List[MemoryToAdd] = Field(default_factory=list, description="The new memories to add.")
+    update: List[MemoryToUpdate] = Field(default_factory=list, description="The existing memories to update.")
+
+
+# What makes a good memory, shared by the tool and structured output instructions
+_MEMORY_INSTRUCTIONS = (
+    "Your task is to add, update, or delete memories based on the user's task. "
+    "You can also decide that no new memories or other changes are needed. "
+    "If you do create new memories, create one or more memories that captures the key information provided by the user, as if you were storing it for future reference. "
+    "Memories should be a brief, third-person statement that encapsulates the most important aspect of the user's input, without adding any extraneous information. "
+    "Don't make a single memory too long, but do create multiple memories if needed to capture all the information. "
+    "When updating a memory, append the existing memory with new information rather than completely overwriting it. "
+    "If there is no new information, do not update the memory. "
+    "Memories should include details that could personalize ongoing interactions with the user, such as:"
+    "  - Personal facts: name, age, occupation, location, interests, preferences, etc."
+    "  - Significant life events or experiences shared by the user"
+    "  - Important context about the user's current situation, challenges or goals"
+    "  - What the user likes or dislikes, their opinions, beliefs, values, etc."
+    "  - Any other details that provide valuable insights into the user's personality, perspective or needs"
+)
+
+
+def _get_system_prompt_prefix(enable_delete_memory: bool, enable_clear_memory: bool) -> str:
+    """Build the static instructions that start the memory manager's system prompt."""
+    system_prompt_lines = [
+        _MEMORY_INSTRUCTIONS,
+        "You will also be provided with a list of existing memories. You may:",
+        "  1. Decide to make no changes to the existing memories.",
+        "  2. Decide to add a new memory using the `add_memory` tool.",
+        "  3. Decide to update an existing memory using the `update_memory` tool.",
+    ]
+    if enable_delete_memory:
+        system_prompt_lines.append("  4. Decide to delete an existing memory using the `delete_memory` tool.")
+    if enable_clear_memory:
+        system_prompt_lines.append("  5. Decide to clear all memories using the `clear_memory` tool.")
+    system_prompt_lines += [
+        "You can call multiple of these tools in a single response if needed. ",
+        "Only add or update memories if it is necessary to capture key information provided by the user.",
+    ]
+    return "\n".join(system_prompt_lines)
+
+
+# The static instructions only vary with the delete/clear toggles, so they are built once at import
+_SYSTEM_PROMPT_PREFIXES: Dict[Tuple[bool, bool], str] = {
+    (enable_delete_memory, enable_clear_memory): _get_system_prompt_prefix(enable_delete_memory, enable_clear_memory)
+    for enable_delete_memory in (True, False)
+    for enable_clear_memory in (True, False)
+}
+
+
+# The instructions for updating the memories of several users in one run
+_BATCH_SYSTEM_PROMPT = "\n".join(
+    [
+        _SYSTEM_PROMPT_PREFIXES[(False, False)],
+        "You are managing the memories of several users at once. Each user is a row identified by a `row_id`. "
+        "Always pass the `row_id` of the user a memory belongs to, and only update memories listed in that row.",
+    ]
+)
+
+
+# The instructions for returning the changes to the memories as structured output instead of calling tools
+_STRUCTURED_SYSTEM_PROMPT = "\n".join(
+    [
+        _MEMORY_INSTRUCTIONS,
+        "You will also be provided with a list of existing memories. You may:",
+        "  1. Decide to make no changes to the existing memories.",
+        "  2. Decide to add new memories by listing them in `add`.",
+        "  3. Decide to update existing memories by listing them in `update`, together with the id of each memory.",
+        "Only add or update memories if it is necessary to capture key information provided by the user.",
+    ]
+)
+
+# For models that only support JSON mode, the fields are described in the prompt instead
+_STRUCTURED_JSON_SYSTEM_PROMPT = _STRUCTURED_SYSTEM_PROMPT + "\n" + get_json_output_prompt(MemoryOps)  # type: ignore
+
+
+# The user message sent by create_or_update_memories to models that require a non-system message
+_CREATE_OR_UPDATE_MEMORIES_MESSAGE = "Create or update memories based on the user's messages."
+
+# The user message sent by create_or_update_memories_batch to models that require a non-system message
+_CREATE_OR_UPDATE_BATCH_MEMORIES_MESSAGE = "Create or update memories based on each user's messages."
+
+
+# The default number of concurrent model calls of acreate_or_update_memories_many
+_DEFAULT_MEMORY_CONCURRENCY = 8
+
+
+def _get_memory_concurrency() -> int:
+    """Read the concurrency of acreate_or_update_memories_many from AGNO_MEMORY_CONCURRENCY, if it is set."""
+    concurrency = getenv("AGNO_MEMORY_CONCURRENCY")
+    if concurrency is None:
+        return _DEFAULT_MEMORY_CONCURRENCY
+    try:
+        return int(concurrency)
+    except ValueError:
+        log_warning(
+            f"Invalid AGNO_MEMORY_CONCURRENCY value: {concurrency!r}. Using {_DEFAULT_MEMORY_CONCURRENCY} instead."
+        )
+        return _DEFAULT_MEMORY_CONCURRENCY
+
+
+def _write_existing_memories(buffer: StringIO, existing_memories: List[Dict[str, Any]]) -> None:
+    """Write the existing memories to the buffer, sorted by id so the same memories always render the same text."""
+    for i, existing_memory in enumerate(sorted(existing_memories, key=lambda m: m["memory_id"])):
+        if i > 0:
+            buffer.write("\n")
+        buffer.write(f"ID: {existing_memory['memory_id']}\nMemory: {existing_memory['memory']}\n")
+
+
+# Functions built from the memory tools, keyed by the code object of the tool.
+# Closures created by the same definition (e.g. the batch tools, which are recreated for every run)
+# share their code object and therefore their name, docstring and JSON schema.
+_TOOL_CACHE: Dict[CodeType, Function] = {}
+
+
+def _get_function_for_tool(tool: Callable) -> Function:
+    """Get the Function for a memory tool, only parsing its signature and docstring the first time."""
+    cached_function = _TOOL_CACHE.get(tool.__code__)
+    if cached_function is None:
+        func = Function.from_callable(tool, strict=True)
+        func.strict = True
+        # Do not keep the first closure (and the batch it captured) alive through the cache
+        _TOOL_CACHE[tool.__code__] = func if tool.__closure__ is None else func.model_copy(update={"entrypoint": None})
+        return func
+    # Module-level tools have no closure, so the cached Function can be used as is
+    if tool.__closure__ is None:
+        return cached_function
+    # Bind the cached definition to this closure
+    return cached_function.model_copy(
+        update={"entrypoint": validate_call(tool, config=dict(arbitrary_types_allowed=True))}  # type: ignore
+    )
+
+
+def _build_tools_and_functions(tools: List[Callable]) -> Tuple[List[Dict[str, Any]], Dict[str, Function]]:
+    """Build the tool definitions and functions to pass to a Model for the given memory tools."""
+    _tools_for_model = []
+    _functions_for_model = {}
+
+    for tool in tools:
+        try:
+            function_name = tool.__name__
+            if function_name not in _functions_for_model:
+                func = _get_function_for_tool(tool)
+                _functions_for_model[func.name] = func
+                _tools_for_model.append({"type": "function", "function": func.to_dict()})
+                log_debug(f"Added function {func.name}")
+        except Exception as e:
+            log_warning(f"Could not add function {tool}: {e}")
+
+    return _tools_for_model, _functions_for_model
+
+
+def _build_memory_row(
+    memory_id: str,
+    memory: str,
+    topics: Optional[List[str]],
+    last_updated: datetime,
+    user_id: str,
+    input_string: Optional[str],
+) -> MemoryRow:
+    """Build the row of a memory, with the same memory dict as UserMemory.to_dict but without creating a UserMemory."""
+    memory_dict: Dict[str, Any] = {"memory_id": memory_id, "memory": memory}
+    if topics is not None:
+        memory_dict["topics"] = topics
+    memory_dict["last_updated"] = last_updated.isoformat()
+    if input_string is not None:
+        memory_dict["input"] = input_string
+    return MemoryRow(id=memory_id, user_id=user_id, memory=memory_dict, last_updated=last_updated)
+
+
+def _supports_threaded_writes(db: MemoryDb) -> bool:
+    """Whether the memories can be written from another thread. Databases built on the v1 MemoryDb do not say."""
+    supports_threaded_writes = getattr(db, "supports_threaded_writes", None)
+    return supports_threaded_writes() if supports_threaded_writes is not None else True
+
+
+def _upsert_memories(db: MemoryDb, memories: List[MemoryRow]) -> bool:
+    """Upsert the memories with a single call if the database supports it, otherwise one memory at a time.
+
+    If the single call fails, each memory is retried on its own so one bad memory does not lose the others.
+    Returns True if every memory was written.
+    """
+    # Databases built on the v1 MemoryDb base class have no upsert_memories
+    upsert_memories = getattr(db, "upsert_memories", None)
+    if upsert_memories is not None:
+        try:
+            upsert_memories(memories)
+            return True
+        except Exception as e:
+            log_error(f"Error storing memories in db, retrying one at a time: {e}")
+
+    success = True
+    for memory in memories:
+        try:
+            db.upsert_memory(memory)
+        except Exception as e:
+            log_error(f"Error storing memory {memory.id} in db: {e}")
+            success = False
+    return success
+
+
+def _delete_memories(db: MemoryDb, memory_ids: List[str]) -> bool:
+    """Delete the memories with a single call if the database supports it, otherwise one memory at a time.
+
+    Returns True if every memory was deleted.
+    """
+    delete_memories = getattr(db, "delete_memories", None)
+    if delete_memories is not None:
+        try:
+            delete_memories(memory_ids)
+            return True
+        except Exception as e:
+            log_error(f"Error deleting memories in db, retrying one at a time: {e}")
+
+    success = True
+    for memory_id in memory_ids:
+        try:
+            db.delete_memory(memory_id)
+        except Exception as e:
+            log_error(f"Error deleting memory {memory_id} in db: {e}")
+            success = False
+    return success
+
+
+@dataclass
+class _MemoryToolContext:
+    """The user, database and input that the memory tools of the current run write to.
+
+    The tools only record their changes here. They are written to the database together by `flush`,
+    instead of one database round trip per tool call. A flush can run in a background thread while the
+    tools keep recording changes, so the pending changes are guarded by a lock.
+    """
+
+    user_id: str
+    db: MemoryDb
+    input_string: str
+    # Memories to create or update, by id, so later changes to a memory replace earlier ones
+    pending_upserts: Dict[str, MemoryRow] = field(default_factory=dict)
+    pending_deletes: List[str] = field(default_factory=list)
+    pending_clear: bool = False
+    # Guards the pending changes
+    _lock: Lock = field(default_factory=Lock, repr=False)
+    # Makes flushes run one at a time, so the changes are written in the order they were made
+    _flush_lock: Lock = field(default_factory=Lock, repr=False)
+
+    def upsert(self, memory: MemoryRow) -> None:
+        with self._lock:
+            if memory.id in self.pending_deletes:
+                self.pending_deletes.remove(memory.id)
+            self.pending_upserts[memory.id] = memory  # type: ignore
+
+    def delete(self, memory_id: str) -> None:
+        with self._lock:
+            self.pending_upserts.pop(memory_id, None)
+            if memory_id not in self.pending_deletes:
+                self.pending_deletes.append(memory_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            # Clearing removes every memory, so the changes recorded before it do not need to be written
+            self.pending_upserts.clear()
+            self.pending_deletes.clear()
+            self.pending_clear = True
+
+    def flush(self) -> bool:
+        """Write the recorded changes to the database: the clear first, then the deletes, then the upserts.
+
+        Returns:
+            bool: True if all changes were written, False if any of them failed.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending_clear, pending_deletes, pending_upserts = (
+                    self.pending_clear,
+                    self.pending_deletes,
+                    self.pending_upserts,
+                )
+                self.pending_clear, self.pending_deletes, self.pending_upserts = False, [], {}
+            if not (pending_clear or pending_deletes or pending_upserts):
+                return True
+            success = True
+            if pending_clear:
+                try:
+                    self.db.clear()
+                except Exception as e:
+                    log_error(f"Error clearing memories in db: {e}")
+                    success = False
+            if pending_deletes:
+                success = _delete_memories(self.db, pending_deletes) and success
+            if pending_upserts:
+                success = _upsert_memories(self.db, list(pending_upserts.values())) and success
+            log_debug(f"Memories flushed: {len(pending_upserts)} upserted, {len(pending_deletes)} deleted")
+            return success
+
+    async def aflush(self) -> None:
+        """Write the recorded changes to the database without blocking the event loop, if the database allows it."""
+        if _supports_threaded_writes(self.db):
+            await asyncio.to_thread(self.flush)
+        else:
+            self.flush()
+
+
+# The memory tools are module-level functions that read the context of the current run from this variable.
+# Context variables are local to each thread and asyncio task, so concurrent memory runs do not interfere.
+_memory_tool_context: ContextVar[_MemoryToolContext] = ContextVar("_memory_tool_context")
+
+
+@contextmanager
+def _use_memory_tool_context(user_id: str, db: MemoryDb, input_string: str) -> Iterator[_MemoryToolContext]:
+    ctx = _MemoryToolContext(user_id=user_id, db=db, input_string=input_string)
+    token = _memory_tool_context.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _memory_tool_context.reset(token)
+        # Also write the changes of a run that failed part way, as the tools used to write them immediately
+        ctx.flush()
+
+
+@asynccontextmanager
+async def _ause_memory_tool_context(user_id: str, db: MemoryDb, input_string: str) -> AsyncIterator[_MemoryToolContext]:
+    ctx = _MemoryToolContext(user_id=user_id, db=db, input_string=input_string)
+    token = _memory_tool_context.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _memory_tool_context.reset(token)
+        # Also write the changes of a run that failed part way, as the tools used to write them immediately
+        await ctx.aflush()
+
+
+def add_memory(memory: str, topics: Optional[List[str]] = None) -> str:
+    """Use this function to add a memory to the database.
+    Args:
+        memory (str): The memory to be added.
+        topics (Optional[List[str]]): The topics of the memory (e.g. ["name", "hobbies", "location"]).
+    Returns:
+        str: A message indicating if the memory was added successfully or not.
+    """
+    ctx = _memory_tool_context.get()
+    try:
+        last_updated = datetime.now()
+        memory_id = str(uuid4())
+        ctx.upsert(_build_memory_row(memory_id, memory, topics, last_updated, ctx.user_id, ctx.input_string))
+        log_debug(f"Memory added: {memory_id}")
+        return "Memory added successfully"
+    except Exception as e:
+        log_warning(f"Error storing memory in db: {e}")
+        return f"Error adding memory: {e}"
+
+
+def update_memory(memory_id: str, memory: str, topics: Optional[List[str]] = None) -> str:
+    """Use this function to update a memory in the database.
+    Args:
+        memory_id (str): The id of the memory to be updated.
+        memory (str): The updated memory.
+        topics (Optional[List[str]]): The topics of the memory (e.g. ["name", "hobbies", "location"]).
+    Returns:
+        str: A message indicating if the memory was updated successfully or not.
+    """
+    ctx = _memory_tool_context.get()
+    try:
+        last_updated = datetime.now()
+        ctx.upsert(_build_memory_row(memory_id, memory, topics, last_updated, ctx.user_id, ctx.input_string))
+        log_debug("Memory updated")
+        return "Memory updated successfully"
+    except Exception as e:
+        log_warning(f"Error storing memory in db: {e}")
+        return f"Error adding memory: {e}"
+
+
+def delete_memory(memory_id: str) -> str:
+    """Use this function to delete a memory from the database.
+    Args:
+        memory_id (str): The id of the memory to be deleted.
+    Returns:
+        str: A message indicating if the memory was deleted successfully or not.
+    """
+    ctx = _memory_tool_context.get()
+    try:
+        ctx.delete(memory_id)
+        log_debug("Memory deleted")
+        return "Memory deleted successfully"
+    except Exception as e:
+        log_warning(f"Error deleting memory in db: {e}")
+        return f"Error deleting memory: {e}"
+
+
+def clear_memory() -> str:
+    """Use this function to clear all memories from the database.
+    Returns:
+        str: A message indicating if the memory was cleared successfully or not.
+    """
+    ctx = _memory_tool_context.get()
+    ctx.clear()
+    log_debug("Memory cleared")
+    return "Memory cleared successfully"
+
+
+# Build the memory tool Functions at import, so no run has to parse their signatures and docstrings
+for _memory_tool in (add_memory, update_memory, delete_memory, clear_memory):
+    _get_function_for_tool(_memory_tool)
+
+
+@dataclass
+class MemoryUpdateTask:
+    """The messages and existing memories of a single user whose memories should be created or updated."""
+
+    messages: List[Message]
+    existing_memories: List[Dict[str, Any]]
+    user_id: str
+    db: MemoryDb
 
 
 @dataclass
@@ -24,36 +473,60 @@ class MemoryManager:
     # Whether memories were created in the last run
     memories_updated: bool = False
 
-    def __init__(self, model: Optional[Model] = None, system_prompt: Optional[str] = None):
+    # Have create_or_update_memories return all changes as a single structured output instead of calling tools.
+    # Saves the round trips of the tool calls, and the new memories are written to the database together.
+    use_structured_outputs: bool = False
+
+    # Have create_or_update_memories stream the model response, so the changes of each round of tool calls are
+    # written while the model generates its next turn. Some OpenAI-compatible servers handle streamed tool calls poorly.
+    stream_memory_updates: bool = False
+
+    def __init__(
+        self,
+        model: Optional[Model] = None,
+        system_prompt: Optional[str] = None,
+        use_structured_outputs: bool = False,
+        stream_memory_updates: bool = False,
+    ):
         self.model = model
         if self.model is not None and isinstance(self.model, str):
             raise ValueError("Model must be a Model object, not a string")
         self.system_prompt = system_prompt
+        self.use_structured_outputs = use_structured_outputs
+        self.stream_memory_updates = stream_memory_updates
+
+    def update_model(self, model: Model) -> None:
+        """Set the response format of the model to the MemoryOps structured output."""
+        if model.supports_native_structured_outputs:
+            model.response_format = MemoryOps
+            model.structured_outputs = True
+
+        elif model.supports_json_schema_outputs:
+            model.response_format = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": MemoryOps.__name__,
+                    "schema": MemoryOps.model_json_schema(),
+                },
+            }
+        else:
+            model.response_format = {"type": "json_object"}
 
     def add_tools_to_model(self, model: Model, tools: List[Callable]) -> None:
-        model = cast(Model, model)
         model.reset_tools_and_functions()
 
-        _tools_for_model = []
-        _functions_for_model = {}
-
-        for tool in tools:
-            try:
-                function_name = tool.__name__
-                if function_name not in _functions_for_model:
-                    func = Function.from_callable(tool, strict=True)  # type: ignore
-                    func.strict = True
-                    _functions_for_model[func.name] = func
-                    _tools_for_model.append({"type": "function", "function": func.to_dict()})
-                    log_debug(f"Added function {func.name}")
-            except Exception as e:
-                log_warning(f"Could not add function {tool}: {e}")
+        _tools_for_model, _functions_for_model = _build_tools_and_functions(tools)
 
         # Set tools on the model
         model.set_tools(tools=_tools_for_model)
         # Set functions on the model
         model.set_functions(functions=_functions_for_model)
 
+    def get_static_system_message(self, enable_delete_memory: bool = True, enable_clear_memory: bool = True) -> Message:
+        # -*- Return the system message with the instructions for the memory manager
+        # It does not change between runs, so providers with prompt caching can cache it
+        return Message(role="system", content=_SYSTEM_PROMPT_PREFIXES[(enable_delete_memory, enable_clear_memory)])
+
     def get_system_message(
         self,
         existing_memories: Optional[List[Dict[str, Any]]] = None,
@@ -61,53 +534,237 @@ class MemoryManager:
         enable_delete_memory: bool = True,
         enable_clear_memory: bool = True,
     ) -> Message:
-        # -*- Return a system message for the memory manager
-        system_prompt_lines = [
-            "Your task is to add, update, or delete memories based on the user's task. "
-            "You can also decide that no new memories or other changes are needed. "
-            "If you do create new memories, create one or more memories that captures the key information provided by the user, as if you were storing it for future reference. "
-            "Memories should be a brief, third-person statement that encapsulates the most important aspect of the user's input, without adding any extraneous information. "
-            "Don't make a single memory too long, but do create multiple memories if needed to capture all the information. "
-            "When updating a memory, append the existing memory with new information rather than completely overwriting it. "
-            "If there is no new information, do not update the memory. "
-            "Memories should include details that could personalize ongoing interactions with the user, such as:"
-            "  - Personal facts: name, age, occupation, location, interests, preferences, etc."
-            "  - Significant life events or experiences shared by the user"
-            "  - Important context about the user's current situation, challenges or goals"
-            "  - What the user likes or dislikes, their opinions, beliefs, values, etc."
-            "  - Any other details that provide valuable insights into the user's personality, perspective or needs",
-            "You will also be provided with a list of existing memories. You may:",
-            "  1. Decide to make no changes to the existing memories.",
-            "  2. Decide to add a new memory using the `add_memory` tool.",
-            "  3. Decide to update an existing memory using the `update_memory` tool.",
-        ]
-        if enable_delete_memory:
-            system_prompt_lines.append("  4. Decide to delete an existing memory using the `delete_memory` tool.")
-        if enable_clear_memory:
-            system_prompt_lines.append("  5. Decide to clear all memories using the `clear_memory` tool.")
-        system_prompt_lines += [
-            "You can call multiple of these tools in a single response if needed. ",
-            "Only add or update memories if it is necessary to capture key information provided by the user.",
-        ]
+        # -*- Return a single system message with both the instructions and the memories for this run
+        # The memory runs send these as two messages, so providers with prompt caching can cache the instructions
+        system_message = self.get_static_system_message(
+            enable_delete_memory=enable_delete_memory, enable_clear_memory=enable_clear_memory
+        )
+        memories_message = self.get_memories_message(existing_memories, messages=messages)
+        if memories_message is not None:
+            system_message.content = f"{system_message.content}\n{memories_message.content}"
+        return system_message
+
+    def get_memories_message(
+        self,
+        existing_memories: Optional[List[Dict[str, Any]]] = None,
+        messages: Optional[List[Message]] = None,
+    ) -> Optional[Message]:
+        # -*- Return a system message with the user's messages and existing memories for this run
+        buffer = StringIO()
 
         if messages:
-            system_prompt_lines.append("\n<user_messages>")
-            user_messages = []
-            for message in messages:
-                if message.role == "user":
-                    user_messages.append(message.get_content_string())
-            system_prompt_lines.append("\n".join(user_messages))
-            system_prompt_lines.append("</user_messages>")
+            buffer.write("<user_messages>\n")
+            buffer.write("\n".join(message.get_content_string() for message in messages if message.role == "user"))
+            buffer.write("\n</user_messages>")
 
         if existing_memories and len(existing_memories) > 0:
-            system_prompt_lines.append("<existing_memories>")
-            for existing_memory in existing_memories:
-                system_prompt_lines.append(f"ID: {existing_memory['memory_id']}")
-                system_prompt_lines.append(f"Memory: {existing_memory['memory']}")
-                system_prompt_lines.append("\n")
-            system_prompt_lines.append("</existing_memories>")
+            if buffer.tell() > 0:
+                buffer.write("\n")
+            buffer.write("<existing_memories>\n")
+            _write_existing_memories(buffer, existing_memories)
+            buffer.write("\n</existing_memories>")
+
+        if buffer.tell() == 0:
+            return None
+        return Message(role="system", content=buffer.getvalue())
+
+    def get_structured_static_system_message(self, model: Model) -> Message:
+        # -*- Return the system message with the instructions for returning the changes as structured output
+        if model.response_format == {"type": "json_object"}:
+            return Message(role="system", content=_STRUCTURED_JSON_SYSTEM_PROMPT)
+        return Message(role="system", content=_STRUCTURED_SYSTEM_PROMPT)
+
+    def get_batch_static_system_message(self) -> Message:
+        # -*- Return the system message with the instructions for updating the memories of several users in one run
+        return Message(role="system", content=_BATCH_SYSTEM_PROMPT)
+
+    def get_batch_rows_message(self, rows: Dict[str, MemoryUpdateTask]) -> Message:
+        # -*- Return a system message with the messages and existing memories of each user in the batch
+        buffer = StringIO()
+        buffer.write("<rows>")
+        for row_id, task in rows.items():
+            buffer.write(f'\n<row row_id="{row_id}">\n<user_messages>\n')
+            buffer.write("\n".join(message.get_content_string() for message in task.messages if message.role == "user"))
+            buffer.write("\n</user_messages>")
+            if task.existing_memories:
+                buffer.write("\n<existing_memories>\n")
+                _write_existing_memories(buffer, task.existing_memories)
+                buffer.write("\n</existing_memories>")
+            buffer.write("\n</row>")
+        buffer.write("\n</rows>")
+
+        return Message(role="system", content=buffer.getvalue())
 
-        return Message(role="system", content="\n".join(system_prompt_lines))
+    def _get_input_string(self, messages: List[Message]) -> str:
+        """Get the user input that is stored alongside the memories created from these messages."""
+        if len(messages) == 1:
+            return messages[0].get_content_string()
+        return "[" + ", ".join(m.get_content_string() for m in messages if m.role == "user" and m.content) + "]"
+
+    def _prepare_tools_and_messages(
+        self,
+        existing_memories: List[Dict[str, Any]],
+        user_message: Optional[str],
+        messages: Optional[List[Message]] = None,
+        enable_delete_memory: bool = True,
+        enable_clear_memory: bool = True,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Function], List[Message]]:
+        """Build the memory tools and the messages for a memory run."""
+        tools, functions = _build_tools_and_functions(
+            self._get_db_tools(enable_delete_memory=enable_delete_memory, enable_clear_memory=enable_clear_memory)
+        )
+
+        # Prepare the List of messages to send to the Model
+        messages_for_model: List[Message]
+        if type(self).get_system_message is not MemoryManager.get_system_message:
+            # Respect subclasses that customise the prompt by overriding get_system_message
+            messages_for_model = [
+                self.get_system_message(
+                    existing_memories,
+                    messages=messages,
+                    enable_delete_memory=enable_delete_memory,
+                    enable_clear_memory=enable_clear_memory,
+                )
+            ]
+        else:
+            # The static instructions come first so they form a cacheable prefix, followed by the per-run memories
+            messages_for_model = [
+                self.get_static_system_message(
+                    enable_delete_memory=enable_delete_memory, enable_clear_memory=enable_clear_memory
+                )
+            ]
+            memories_message = self.get_memories_message(existing_memories, messages=messages)
+            if memories_message is not None:
+                messages_for_model.append(memories_message)
+        if user_message is not None:
+            messages_for_model.append(Message(role="user", content=user_message))
+        return tools, functions, messages_for_model
+
+    def _prepare_structured_model_and_messages(
+        self, model: Model, existing_memories: List[Dict[str, Any]], messages: List[Message]
+    ) -> Tuple[Model, List[Message]]:
+        """Build the model copy with the MemoryOps response format and the messages for a structured memory run."""
+        model_copy = model.shallow_clone_for_tools()
+        self.update_model(model_copy)
+
+        messages_for_model: List[Message] = [self.get_structured_static_system_message(model_copy)]
+        memories_message = self.get_memories_message(existing_memories, messages=messages)
+        if memories_message is not None:
+            messages_for_model.append(memories_message)
+        if model_copy.requires_user_message:
+            messages_for_model.append(Message(role="user", content=_CREATE_OR_UPDATE_MEMORIES_MESSAGE))
+        return model_copy, messages_for_model
+
+    def _parse_memory_ops(self, model: Model, response: ModelResponse) -> Optional[MemoryOps]:
+        # If the model natively supports structured outputs, the parsed value is already in the structured format
+        if model.supports_native_structured_outputs and isinstance(response.parsed, MemoryOps):
+            return response.parsed
+
+        # Otherwise convert the response to the structured format
+        if isinstance(response.content, str):
+            try:
+                memory_ops: Optional[MemoryOps] = parse_response_model_str(response.content, MemoryOps)  # type: ignore
+                if memory_ops is not None:
+                    return memory_ops
+                log_warning("Failed to convert memory manager response to MemoryOps")
+            except Exception as e:
+                log_warning(f"Failed to convert memory manager response to MemoryOps: {e}")
+        return None
+
+    def _apply_memory_ops(
+        self,
+        memory_ops: MemoryOps,
+        existing_memories: List[Dict[str, Any]],
+        user_id: str,
+        db: MemoryDb,
+        input_string: str,
+    ) -> None:
+        """Write the memories added and updated by the model to the database in a single call."""
+        last_updated = datetime.now()
+        memory_ids = {existing_memory["memory_id"] for existing_memory in existing_memories}
+        memory_rows: List[MemoryRow] = []
+        for new_memory in memory_ops.add:
+            memory_id = str(uuid4())
+            memory_rows.append(
+                _build_memory_row(memory_id, new_memory.memory, new_memory.topics, last_updated, user_id, input_string)
+            )
+        for updated_memory in memory_ops.update:
+            # Only memories of this user can be updated
+            if updated_memory.memory_id not in memory_ids:
+                log_warning(f"Memory {updated_memory.memory_id} is not an existing memory of the user")
+                continue
+            memory_rows.append(
+                _build_memory_row(
+                    updated_memory.memory_id,
+                    updated_memory.memory,
+                    updated_memory.topics,
+                    last_updated,
+                    user_id,
+                    input_string,
+                )
+            )
+
+        # Database errors are logged, like the memory tools do, instead of failing the run
+        if len(memory_rows) > 0 and _upsert_memories(db, memory_rows):
+            self.memories_updated = True
+            log_debug(f"Memories added or updated: {len(memory_rows)}")
+
+    def _stream_response(
+        self,
+        model: Model,
+        ctx: _MemoryToolContext,
+        messages_for_model: List[Message],
+        tools: List[Dict[str, Any]],
+        functions: Dict[str, Function],
+    ) -> Optional[str]:
+        """Stream the response, writing the changes of each round of tool calls while the model continues."""
+        content = ""
+        # Only write from another thread if the database allows it, e.g. not for an in-memory SQLite database
+        executor = ThreadPoolExecutor(max_workers=1) if _supports_threaded_writes(ctx.db) else None
+        flush_future: Optional[Future] = None
+        try:
+            for model_response in model.response_stream(messages=messages_for_model, tools=tools, functions=functions):
+                if model_response.event == ModelResponseEvent.tool_call_completed.value:
+                    self.memories_updated = True
+                    # Changes made while a flush is running are picked up by the next flush
+                    if executor is not None and (flush_future is None or flush_future.done()):
+                        flush_future = executor.submit(ctx.flush)
+                elif model_response.event == ModelResponseEvent.assistant_response.value and model_response.content:
+                    content += model_response.content
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        return content
+
+    async def _astream_response(
+        self,
+        model: Model,
+        ctx: _MemoryToolContext,
+        messages_for_model: List[Message],
+        tools: List[Dict[str, Any]],
+        functions: Dict[str, Function],
+    ) -> Optional[str]:
+        """Stream the response, writing the changes of each round of tool calls while the model continues."""
+        content = ""
+        # Only write from another thread if the database allows it, e.g. not for an in-memory SQLite database
+        threaded_writes = _supports_threaded_writes(ctx.db)
+        flush_task: Optional[asyncio.Task] = None
+        try:
+            async for model_response in model.aresponse_stream(
+                messages=messages_for_model, tools=tools, functions=functions
+            ):
+                if model_response.event == ModelResponseEvent.tool_call_completed.value:
+                    self.memories_updated = True
+                    # Changes made while a flush is running are picked up by the next flush
+                    if threaded_writes and (flush_task is None or flush_task.done()):
+                        flush_task = asyncio.create_task(asyncio.to_thread(ctx.flush))
+                elif model_response.event == ModelResponseEvent.assistant_response.value and model_response.content:
+                    content += model_response.content
+        finally:
+            # Never leave a flush running, even if the model raised
+            if flush_task is not None:
+                await flush_task
+        return content
 
     def create_or_update_memories(
         self,
@@ -122,37 +779,44 @@ class MemoryManager:
 
         log_debug("MemoryManager Start", center=True)
 
-        if len(messages) == 1:
-            input_string = messages[0].get_content_string()
-        else:
-            input_string = (
-                f"[{', '.join([m.get_content_string() for m in messages if m.role == 'user' and m.content])}]"
+        input_string = self._get_input_string(messages)
+
+        if self.use_structured_outputs:
+            model_copy, messages_for_model = self._prepare_structured_model_and_messages(
+                self.model, existing_memories, messages
             )
 
-        model_copy = deepcopy(self.model)
-        # Update the Model (set defaults, add logit etc.)
-        self.add_tools_to_model(
-            model_copy,
-            self._get_db_tools(user_id, db, input_string, enable_delete_memory=False, enable_clear_memory=False),
-        )
+            # Generate the changes to the memories in a single response and write them together
+            response = model_copy.response(messages=messages_for_model)
+            memory_ops = self._parse_memory_ops(model_copy, response)
+            if memory_ops is not None:
+                self._apply_memory_ops(memory_ops, existing_memories, user_id, db, input_string)
+            log_debug("MemoryManager End", center=True)
 
-        # Prepare the List of messages to send to the Model
-        messages_for_model: List[Message] = [
-            self.get_system_message(
-                existing_memories, messages=messages, enable_delete_memory=False, enable_clear_memory=False
-            ),
-            # For models that require a non-system message
-            Message(role="user", content="Create or update memories based on the user's messages."),
-        ]
+            return response.content or "No response from model"
 
-        # Generate a response from the Model (includes running function calls)
-        response = model_copy.response(messages=messages_for_model)
+        tools, functions, messages_for_model = self._prepare_tools_and_messages(
+            existing_memories=existing_memories,
+            # The user's messages are in the system message, so only add a user message for models that require one.
+            # It is the same for every run so it does not break prompt caching.
+            user_message=_CREATE_OR_UPDATE_MEMORIES_MESSAGE if self.model.requires_user_message else None,
+            messages=messages,
+            enable_delete_memory=False,
+            enable_clear_memory=False,
+        )
 
-        if response.tool_calls is not None and len(response.tool_calls) > 0:
-            self.memories_updated = True
+        # Generate a response from the Model (includes running function calls)
+        with _use_memory_tool_context(user_id, db, input_string) as ctx:
+            if self.stream_memory_updates:
+                content = self._stream_response(self.model, ctx, messages_for_model, tools, functions)
+            else:
+                response = self.model.response(messages=messages_for_model, tools=tools, functions=functions)
+                if response.tool_calls is not None and len(response.tool_calls) > 0:
+                    self.memories_updated = True
+                content = response.content
         log_debug("MemoryManager End", center=True)
 
-        return response.content or "No response from model"
+        return content or "No response from model"
 
     async def acreate_or_update_memories(
         self,
@@ -167,35 +831,71 @@ class MemoryManager:
 
         log_debug("MemoryManager Start", center=True)
 
-        if len(messages) == 1:
-            input_string = messages[0].get_content_string()
-        else:
-            input_string = (
-                f"[{', '.join([m.get_content_string() for m in messages if m.role == 'user' and m.content])}]"
+        input_string = self._get_input_string(messages)
+
+        if self.use_structured_outputs:
+            model_copy, messages_for_model = self._prepare_structured_model_and_messages(
+                self.model, existing_memories, messages
             )
 
-        model_copy = deepcopy(self.model)
-        # Update the Model (set defaults, add logit etc.)
-        self.add_tools_to_model(
-            model_copy,
-            self._get_db_tools(user_id, db, input_string, enable_delete_memory=False, enable_clear_memory=False),
-        )
+            # Generate the changes to the memories in a single response and write them together
+            response = await model_copy.aresponse(messages=messages_for_model)
+            memory_ops = self._parse_memory_ops(model_copy, response)
+            if memory_ops is not None:
+                self._apply_memory_ops(memory_ops, existing_memories, user_id, db, input_string)
+            log_debug("MemoryManager End", center=True)
 
-        # Prepare the List of messages to send to the Model
-        messages_for_model: List[Message] = [
-            self.get_system_message(existing_memories, messages=messages),
-            # For models that require a non-system message
-            Message(role="user", content="Create or update memories based on the user's messages."),
-        ]
+            return response.content or "No response from model"
 
-        # Generate a response from the Model (includes running function calls)
-        response = await model_copy.aresponse(messages=messages_for_model)
+        tools, functions, messages_for_model = self._prepare_tools_and_messages(
+            existing_memories=existing_memories,
+            # The user's messages are in the system message, so only add a user message for models that require one.
+            # It is the same for every run so it does not break prompt caching.
+            user_message=_CREATE_OR_UPDATE_MEMORIES_MESSAGE if self.model.requires_user_message else None,
+            messages=messages,
+            enable_delete_memory=False,
+            enable_clear_memory=False,
+        )
 
-        if response.tool_calls is not None and len(response.tool_calls) > 0:
-            self.memories_updated = True
+        # Generate a response from the Model (includes running function calls)
+        async with _ause_memory_tool_context(user_id, db, input_string) as ctx:
+            if self.stream_memory_updates:
+                content = await self._astream_response(self.model, ctx, messages_for_model, tools, functions)
+            else:
+                response = await self.model.aresponse(messages=messages_for_model, tools=tools, functions=functions)
+                if response.tool_calls is not None and len(response.tool_calls) > 0:
+                    self.memories_updated = True
+                content = response.content
         log_debug("MemoryManager End", center=True)
 
-        return response.content or "No response from model"
+        return content or "No response from model"
+
+    async def acreate_or_update_memories_many(
+        self, tasks: List[MemoryUpdateTask], concurrency: Optional[int] = None
+    ) -> List[str]:
+        """Create or update the memories of several users concurrently, with one model call per user.
+
+        Args:
+            tasks (List[MemoryUpdateTask]): The messages and existing memories of each user.
+            concurrency (Optional[int]): The maximum number of model calls in flight.
+                Defaults to the AGNO_MEMORY_CONCURRENCY environment variable, or 8.
+        Returns:
+            List[str]: The model response for each task, in the same order as the tasks.
+        """
+        if concurrency is None:
+            concurrency = _get_memory_concurrency()
+        semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+        async def _run_task(task: MemoryUpdateTask) -> str:
+            async with semaphore:
+                return await self.acreate_or_update_memories(
+                    messages=task.messages,
+                    existing_memories=task.existing_memories,
+                    user_id=task.user_id,
+                    db=task.db,
+                )
+
+        return list(await asyncio.gather(*(_run_task(task) for task in tasks)))
 
     def run_memory_task(
         self,
@@ -210,19 +910,14 @@ class MemoryManager:
 
         log_debug("MemoryManager Start", center=True)
 
-        model_copy = deepcopy(self.model)
-        # Update the Model (set defaults, add logit etc.)
-        self.add_tools_to_model(model_copy, self._get_db_tools(user_id, db, task))
-
-        # Prepare the List of messages to send to the Model
-        messages_for_model: List[Message] = [
-            self.get_system_message(existing_memories),
-            # For models that require a non-system message
-            Message(role="user", content=task),
-        ]
+        tools, functions, messages_for_model = self._prepare_tools_and_messages(
+            existing_memories=existing_memories,
+            user_message=task,
+        )
 
         # Generate a response from the Model (includes running function calls)
-        response = model_copy.response(messages=messages_for_model)
+        with _use_memory_tool_context(user_id, db, task):
+            response = self.model.response(messages=messages_for_model, tools=tools, functions=functions)
 
         if response.tool_calls is not None and len(response.tool_calls) > 0:
             self.memories_updated = True
@@ -243,19 +938,14 @@ class MemoryManager:
 
         log_debug("MemoryManager Start", center=True)
 
-        model_copy = deepcopy(self.model)
-        # Update the Model (set defaults, add logit etc.)
-        self.add_tools_to_model(model_copy, self._get_db_tools(user_id, db, task))
-
-        # Prepare the List of messages to send to the Model
-        messages_for_model: List[Message] = [
-            self.get_system_message(existing_memories),
-            # For models that require a non-system message
-            Message(role="user", content=task),
-        ]
+        tools, functions, messages_for_model = self._prepare_tools_and_messages(
+            existing_memories=existing_memories,
+            user_message=task,
+        )
 
         # Generate a response from the Model (includes running function calls)
-        response = await model_copy.aresponse(messages=messages_for_model)
+        async with _ause_memory_tool_context(user_id, db, task):
+            response = await self.model.aresponse(messages=messages_for_model, tools=tools, functions=functions)
 
         if response.tool_calls is not None and len(response.tool_calls) > 0:
             self.memories_updated = True
@@ -263,114 +953,128 @@ class MemoryManager:
 
         return response.content or "No response from model"
 
+    def create_or_update_memories_batch(self, tasks: List[MemoryUpdateTask], batch_size: int = 8) -> List[str]:
+        """Create or update the memories of several users, packing up to `batch_size` users into each model call.
+
+        Args:
+            tasks (List[MemoryUpdateTask]): The messages and existing memories of each user.
+            batch_size (int): The maximum number of users per model call. Larger batches make fewer calls,
+                but the prompt grows with every user and the model is more likely to mix up rows.
+        Returns:
+            List[str]: One entry per task, in the same order as the tasks. The model replies once per batch,
+                so each entry is the reply of the batch the task was part of, shared by every user in it.
+        """
+        if self.model is None:
+            log_error("No model provided for memory manager")
+            return ["No model provided for memory manager"] * len(tasks)
+
+        log_debug("MemoryManager Batch Start", center=True)
+
+        batch_size = max(batch_size, 1)
+        responses: List[str] = []
+        for batch_start in range(0, len(tasks), batch_size):
+            rows = {str(row_id): task for row_id, task in enumerate(tasks[batch_start : batch_start + batch_size])}
+
+            contexts = {
+                row_id: _MemoryToolContext(
+                    user_id=task.user_id, db=task.db, input_string=self._get_input_string(task.messages)
+                )
+                for row_id, task in rows.items()
+            }
+            tools, functions = _build_tools_and_functions(self._get_batch_db_tools(rows, contexts))
+
+            # Prepare the List of messages to send to the Model
+            messages_for_model: List[Message] = [
+                self.get_batch_static_system_message(),
+                self.get_batch_rows_message(rows),
+            ]
+            if self.model.requires_user_message:
+                # For models that require a non-system message
+                messages_for_model.append(Message(role="user", content=_CREATE_OR_UPDATE_BATCH_MEMORIES_MESSAGE))
+
+            # Generate a response from the Model (includes running function calls)
+            try:
+                response = self.model.response(messages=messages_for_model, tools=tools, functions=functions)
+            finally:
+                for ctx in contexts.values():
+                    ctx.flush()
+
+            if response.tool_calls is not None and len(response.tool_calls) > 0:
+                self.memories_updated = True
+            responses.extend([response.content or "No response from model"] * len(rows))
+
+        log_debug("MemoryManager Batch End", center=True)
+
+        return responses
+
     # -*- DB Functions
     def _get_db_tools(
         self,
-        user_id: str,
-        db: MemoryDb,
-        input_string: str,
         enable_add_memory: bool = True,
         enable_update_memory: bool = True,
         enable_delete_memory: bool = True,
         enable_clear_memory: bool = True,
     ) -> List[Callable]:
-        from datetime import datetime
+        functions: List[Callable] = []
+        if enable_add_memory:
+            functions.append(add_memory)
+        if enable_update_memory:
+            functions.append(update_memory)
+        if enable_delete_memory:
+            functions.append(delete_memory)
+        if enable_clear_memory:
+            functions.append(clear_memory)
+        return functions
 
-        def add_memory(memory: str, topics: Optional[List[str]] = None) -> str:
-            """Use this function to add a memory to the database.
+    def _get_batch_db_tools(
+        self, rows: Dict[str, MemoryUpdateTask], contexts: Dict[str, _MemoryToolContext]
+    ) -> List[Callable]:
+        def add_memory(row_id: str, memory: str, topics: Optional[List[str]] = None) -> str:
+            """Use this function to add a memory for a user to the database.
             Args:
+                row_id (str): The row_id of the user the memory belongs to.
                 memory (str): The memory to be added.
                 topics (Optional[List[str]]): The topics of the memory (e.g. ["name", "hobbies", "location"]).
             Returns:
                 str: A message indicating if the memory was added successfully or not.
             """
-            from uuid import uuid4
-
+            if row_id not in rows:
+                return f"Unknown row_id: {row_id}"
+            ctx = contexts[row_id]
             try:
                 last_updated = datetime.now()
                 memory_id = str(uuid4())
-                db.upsert_memory(
-                    MemoryRow(
-                        id=memory_id,
-                        user_id=user_id,
-                        memory=UserMemory(
-                            memory_id=memory_id,
-                            memory=memory,
-                            topics=topics,
-                            last_updated=last_updated,
-                            input=input_string,
-                        ).to_dict(),
-                        last_updated=last_updated,
-                    )
-                )
+                ctx.upsert(_build_memory_row(memory_id, memory, topics, last_updated, ctx.user_id, ctx.input_string))
                 log_debug(f"Memory added: {memory_id}")
                 return "Memory added successfully"
             except Exception as e:
                 log_warning(f"Error storing memory in db: {e}")
                 return f"Error adding memory: {e}"
 
-        def update_memory(memory_id: str, memory: str, topics: Optional[List[str]] = None) -> str:
-            """Use this function to update a memory in the database.
+        def update_memory(row_id: str, memory_id: str, memory: str, topics: Optional[List[str]] = None) -> str:
+            """Use this function to update a memory of a user in the database.
             Args:
+                row_id (str): The row_id of the user the memory belongs to.
                 memory_id (str): The id of the memory to be updated.
                 memory (str): The updated memory.
                 topics (Optional[List[str]]): The topics of the memory (e.g. ["name", "hobbies", "location"]).
             Returns:
                 str: A message indicating if the memory was updated successfully or not.
             """
+            if row_id not in rows:
+                return f"Unknown row_id: {row_id}"
+            task = rows[row_id]
+            # Never let the model update a memory that belongs to another user
+            if not any(existing_memory["memory_id"] == memory_id for existing_memory in task.existing_memories):
+                return f"Memory {memory_id} does not belong to row {row_id}"
+            ctx = contexts[row_id]
             try:
                 last_updated = datetime.now()
-                db.upsert_memory(
-                    MemoryRow(
-                        id=memory_id,
-                        user_id=user_id,
-                        memory=UserMemory(
-                            memory_id=memory_id,
-                            memory=memory,
-                            topics=topics,
-                            last_updated=last_updated,
-                            input=input_string,
-                        ).to_dict(),
-                        last_updated=last_updated,
-                    )
-                )
+                ctx.upsert(_build_memory_row(memory_id, memory, topics, last_updated, ctx.user_id, ctx.input_string))
                 log_debug("Memory updated")
                 return "Memory updated successfully"
             except Exception as e:
-                log_warning("Error storing memory in db: {e}")
-                return f"Error adding memory: {e}"
-
-        def delete_memory(memory_id: str) -> str:
-            """Use this function to delete a memory from the database.
-            Args:
-                memory_id (str): The id of the memory to be deleted.
-            Returns:
-                str: A message indicating if the memory was deleted successfully or not.
-            """
-            try:
-                db.delete_memory(memory_id=memory_id)
-                log_debug("Memory deleted")
-                return "Memory deleted successfully"
-            except Exception as e:
-                log_warning(f"Error deleting memory in db: {e}")
-                return f"Error deleting memory: {e}"
-
-        def clear_memory() -> str:
-            """Use this function to clear all memories from the database.
-            Returns:
-                str: A message indicating if the memory was cleared successfully or not.
-            """
-            db.clear()
-            log_debug("Memory cleared")
-            return "Memory cleared successfully"
+                log_warning(f"Error storing memory in db: {e}")
+                return f"Error updating memory: {e}"
 
-        functions: List[Callable] = []
-        if enable_add_memory:
-            functions.append(add_memory)
-        if enable_update_memory:
-            functions.append(update_memory)
-        if enable_delete_memory:
-            functions.append(delete_memory)
-        if enable_clear_memory:
-            functions.append(clear_memory)
-        return functions
+        return [add_memory, update_memory]
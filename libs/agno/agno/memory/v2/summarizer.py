@@ -1,4 +1,3 @@
-from copy import deepcopy
 from dataclasses import dataclass
 from textwrap import dedent
 from typing import Any, Dict, List, Optional, cast
@@ -102,7 +101,7 @@ class SessionSummarizer:
             log_info("No conversation provided for summarization.")
             return None
 
-        model_copy = deepcopy(self.model)
+        model_copy = self.model.shallow_clone_for_tools()
         self.update_model(model_copy)
 
         # Prepare the List of messages to send to the Model
@@ -159,7 +158,7 @@ class SessionSummarizer:
             log_info("No conversation provided for summarization.")
             return None
 
-        model_copy = deepcopy(self.model)
+        model_copy = self.model.shallow_clone_for_tools()
         self.update_model(model_copy)
 
         # Prepare the List of messages to send to the Model
@@ -130,10 +130,13 @@ class AwsBedrock(Model):
 
     def _format_messages(self, messages: List[Message]) -> Tuple[List[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
         formatted_messages: List[Dict[str, Any]] = []
-        system_message = None
+        system_message: Optional[List[Dict[str, Any]]] = None
         for message in messages:
             if message.role == "system":
-                system_message = [{"text": message.content}]
+                # Keep every system message, e.g. a static prompt followed by per-request context
+                if system_message is None:
+                    system_message = []
+                system_message.append({"text": message.content})
             else:
                 formatted_message: Dict[str, Any] = {"role": message.role}
                 formatted_message["content"] = []
@@ -55,6 +55,8 @@ class Model(ABC):
     supports_native_structured_outputs: bool = False
     # True if the Model requires a json_schema for structured outputs (e.g. LMStudio)
     supports_json_schema_outputs: bool = False
+    # True if the Model requires at least one non-system message in a request (e.g. Anthropic, Gemini)
+    requires_user_message: bool = True
 
     # Controls which (if any) function is called by the model.
     # "none" means the model will not call a function and instead generates a message.
@@ -159,16 +161,36 @@ class Model(ABC):
         self._tools = None
         self._functions = None
 
-    def response(self, messages: List[Message]) -> ModelResponse:
+    def _with_tools(self, tools: Optional[List[Dict]], functions: Optional[Dict[str, Function]]) -> "Model":
+        """Return a copy of the Model using the given tools and functions, leaving this Model untouched.
+
+        Like a deepcopy of the Model, the copy does not carry over the response format.
+        """
+        new_model = self.shallow_clone_for_tools()
+        new_model._tools = tools
+        new_model._functions = functions or None
+        return new_model
+
+    def response(
+        self,
+        messages: List[Message],
+        tools: Optional[List[Dict]] = None,
+        functions: Optional[Dict[str, Function]] = None,
+    ) -> ModelResponse:
         """
         Generate a response from the model.
 
         Args:
             messages: List of messages in the conversation
+            tools: Tools to use for this response instead of the Model's tools
+            functions: Functions to use for this response instead of the Model's functions
 
         Returns:
             ModelResponse: The model's response
         """
+        if tools is not None or functions is not None:
+            # Run on a copy so the tools never leak into this Model or into concurrent responses
+            return self._with_tools(tools, functions).response(messages=messages)
 
         log_debug(f"{self.get_provider()} Response Start", center=True, symbol="-")
         log_debug(f"Model: {self.id}", center=True, symbol="-")
@@ -229,16 +251,26 @@ class Model(ABC):
         log_debug(f"{self.get_provider()} Response End", center=True, symbol="-")
         return model_response
 
-    async def aresponse(self, messages: List[Message]) -> ModelResponse:
+    async def aresponse(
+        self,
+        messages: List[Message],
+        tools: Optional[List[Dict]] = None,
+        functions: Optional[Dict[str, Function]] = None,
+    ) -> ModelResponse:
         """
         Generate an asynchronous response from the model.
 
         Args:
             messages: List of messages in the conversation
+            tools: Tools to use for this response instead of the Model's tools
+            functions: Functions to use for this response instead of the Model's functions
 
         Returns:
             ModelResponse: The model's response
         """
+        if tools is not None or functions is not None:
+            # Run on a copy so the tools never leak into this Model or into concurrent responses
+            return await self._with_tools(tools, functions).aresponse(messages=messages)
 
         log_debug(f"{self.get_provider()} Async Response Start", center=True, symbol="-")
         log_debug(f"Model: {self.id}", center=True, symbol="-")
@@ -489,16 +521,27 @@ class Model(ABC):
                 stream_data=stream_data, assistant_message=assistant_message, model_response=model_response_delta
             )
 
-    def response_stream(self, messages: List[Message]) -> Iterator[ModelResponse]:
+    def response_stream(
+        self,
+        messages: List[Message],
+        tools: Optional[List[Dict]] = None,
+        functions: Optional[Dict[str, Function]] = None,
+    ) -> Iterator[ModelResponse]:
         """
         Generate a streaming response from the model.
 
         Args:
             messages: List of messages in the conversation
+            tools: Tools to use for this response instead of the Model's tools
+            functions: Functions to use for this response instead of the Model's functions
 
         Returns:
             Iterator[ModelResponse]: Iterator of model responses
         """
+        if tools is not None or functions is not None:
+            # Run on a copy so the tools never leak into this Model or into concurrent responses
+            yield from self._with_tools(tools, functions).response_stream(messages=messages)
+            return
 
         log_debug(f"{self.get_provider()} Response Stream Start", center=True, symbol="-")
         log_debug(f"Model: {self.id}", center=True, symbol="-")
@@ -584,16 +627,28 @@ class Model(ABC):
             ):
                 yield model_response
 
-    async def aresponse_stream(self, messages: List[Message]) -> AsyncIterator[ModelResponse]:
+    async def aresponse_stream(
+        self,
+        messages: List[Message],
+        tools: Optional[List[Dict]] = None,
+        functions: Optional[Dict[str, Function]] = None,
+    ) -> AsyncIterator[ModelResponse]:
         """
         Generate an asynchronous streaming response from the model.
 
         Args:
             messages: List of messages in the conversation
+            tools: Tools to use for this response instead of the Model's tools
+            functions: Functions to use for this response instead of the Model's functions
 
         Returns:
             AsyncIterator[ModelResponse]: Async iterator of model responses
         """
+        if tools is not None or functions is not None:
+            # Run on a copy so the tools never leak into this Model or into concurrent responses
+            async for response in self._with_tools(tools, functions).aresponse_stream(messages=messages):
+                yield response
+            return
 
         log_debug(f"{self.get_provider()} Async Response Stream Start", center=True, symbol="-")
         log_debug(f"Model: {self.id}", center=True, symbol="-")
@@ -1137,6 +1192,32 @@ class Model(ABC):
         self._functions = None
         self._function_call_stack = None
 
+    def shallow_clone_for_tools(self) -> "Model":
+        """Create a shallow copy of the Model that can be given its own tools.
+
+        The configuration and clients are shared with this Model, only the per-run state
+        (response format, tools, functions and function call stack) is reset on the copy.
+
+        Returns:
+            Model: A new Model instance with no tools or functions set.
+        """
+        new_model = self._fast_clone()
+        new_model.clear()
+        new_model.reset_tools_and_functions()
+        return new_model
+
+    def _fast_clone(self) -> "Model":
+        """Copy the Model for a single run.
+
+        A shallow copy is enough because callers replace the per-run state on the copy.
+        Subclasses that define their own __deepcopy__ are deep copied so their copy semantics are kept.
+        """
+        from copy import copy, deepcopy
+
+        if type(self).__deepcopy__ is not Model.__deepcopy__:
+            return deepcopy(self)
+        return copy(self)
+
     def __deepcopy__(self, memo):
         """Create a deep copy of the Model instance.
 
@@ -330,7 +330,8 @@ class Gemini(Model):
         for message in messages:
             role = message.role
             if role in ["system", "developer"]:
-                system_message = message.content
+                # Keep every system message, e.g. a static prompt followed by per-request context
+                system_message = message.content if system_message is None else f"{system_message}\n{message.content}"
                 continue
 
             # Set the role for the message according to Gemini's requirements
@@ -42,6 +42,7 @@ class OpenAIChat(Model):
     name: str = "OpenAIChat"
     provider: str = "OpenAI"
     supports_native_structured_outputs: bool = True
+    requires_user_message: bool = False
 
     # Request parameters
     store: Optional[bool] = None
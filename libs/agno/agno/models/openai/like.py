@@ -9,6 +9,8 @@ class OpenAILike(OpenAIChat):
     id: str = "not-provided"
     name: str = "OpenAILike"
     api_key: Optional[str] = "not-provided"
+    # OpenAI-compatible servers often apply chat templates that need a user message
+    requires_user_message: bool = True
 
     role_map = {
         "system": "system",
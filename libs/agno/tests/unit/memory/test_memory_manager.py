@@ -0,0 +1,827 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+from unittest.mock import Mock
+
+import pytest
+
+from agno.memory.db.base import MemoryDb as V1MemoryDbBase
+from agno.memory.v2 import MemoryManager
+from agno.memory.v2.manager import _TOOL_CACHE, MemoryUpdateTask
+from agno.models.base import Model
+from agno.models.message import Message
+from agno.models.response import ModelResponse
+
+
+@dataclass
+class MockModel(Model):
+    """Model that replays a scripted list of responses instead of calling a provider."""
+
+    id: str = "mock-model"
+    responses: List[ModelResponse] = field(default_factory=list)
+    invocations: List[List[Message]] = field(default_factory=list)
+
+    def invoke(self, *args, **kwargs) -> Any:
+        self.invocations.append(list(kwargs["messages"]))
+        return self.responses.pop(0) if self.responses else ModelResponse(role="assistant", content="Done")
+
+    async def ainvoke(self, *args, **kwargs) -> Any:
+        return self.invoke(*args, **kwargs)
+
+    def invoke_stream(self, *args, **kwargs):
+        yield self.invoke(*args, **kwargs)
+
+    async def ainvoke_stream(self, *args, **kwargs):
+        yield self.invoke(*args, **kwargs)
+
+    def parse_provider_response(self, response: Any) -> ModelResponse:
+        return response
+
+    def parse_provider_response_delta(self, response: Any) -> ModelResponse:
+        return response
+
+
+def tool_call_response(*calls: Dict[str, Any]) -> ModelResponse:
+    return ModelResponse(
+        role="assistant",
+        tool_calls=[
+            {
+                "id": f"call_{i}",
+                "type": "function",
+                "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])},
+            }
+            for i, call in enumerate(calls)
+        ],
+    )
+
+
+class V1MemoryDb(V1MemoryDbBase):
+    """An in-memory database built on the v1 MemoryDb base class, which has no bulk methods."""
+
+    def __init__(self):
+        self.rows: Dict[str, Any] = {}
+
+    def create(self) -> None:
+        pass
+
+    def memory_exists(self, memory) -> bool:
+        return memory.id in self.rows
+
+    def read_memories(self, user_id=None, limit=None, sort=None):
+        return list(self.rows.values())
+
+    def upsert_memory(self, memory):
+        self.rows[memory.id] = memory
+
+    def delete_memory(self, id: str) -> None:
+        self.rows.pop(id, None)
+
+    def drop_table(self) -> None:
+        pass
+
+    def table_exists(self) -> bool:
+        return True
+
+    def clear(self) -> bool:
+        self.rows.clear()
+        return True
+
+
+@pytest.fixture
+def mock_db():
+    db = Mock()
+    db.read_memories.return_value = []
+    db.supports_threaded_writes.return_value = True
+    return db
+
+
+@pytest.fixture
+def model():
+    return MockModel(
+        responses=[
+            tool_call_response(
+                {"name": "add_memory", "arguments": {"memory": "The user's name is John Doe", "topics": ["name"]}}
+            ),
+            ModelResponse(role="assistant", content="Memories updated"),
+        ]
+    )
+
+
+def test_shallow_clone_for_tools_resets_tools(model):
+    model.set_tools([{"type": "function", "function": {"name": "tool"}}])
+    model.set_functions({"tool": Mock()})
+
+    clone = model.shallow_clone_for_tools()
+
+    assert clone is not model
+    assert clone.id == model.id
+    assert clone._tools is None
+    assert clone._functions is None
+    # The original model keeps its tools
+    assert model._tools is not None
+    assert model._functions is not None
+
+
+def test_shallow_clone_for_tools_respects_custom_deepcopy():
+    @dataclass
+    class DeepCopiedModel(MockModel):
+        def __deepcopy__(self, memo):
+            return DeepCopiedModel(id=self.id, invocations=[])
+
+    model = DeepCopiedModel()
+
+    clone = model.shallow_clone_for_tools()
+
+    assert isinstance(clone, DeepCopiedModel)
+    assert clone.invocations is not model.invocations
+
+
+def test_response_with_tools_does_not_modify_model(model):
+    function = Mock()
+    function.name = "tool"
+
+    response = model.response(
+        messages=[Message(role="user", content="Hello")],
+        tools=[{"type": "function", "function": {"name": "tool"}}],
+        functions={"tool": function},
+    )
+
+    assert response.tool_calls is not None
+    assert model._tools is None
+    assert model._functions is None
+    assert model._function_call_stack is None
+
+
+def test_response_with_tools_does_not_use_response_format():
+    @dataclass
+    class FormatRecordingModel(MockModel):
+        response_formats: List[Any] = field(default_factory=list)
+
+        def invoke(self, *args, **kwargs) -> Any:
+            self.response_formats.append(self.response_format)
+            return super().invoke(*args, **kwargs)
+
+    model = FormatRecordingModel(
+        response_format={"type": "json_object"},
+        responses=[
+            tool_call_response(
+                {"name": "add_memory", "arguments": {"memory": "The user's name is John Doe", "topics": ["name"]}}
+            ),
+            ModelResponse(role="assistant", content="Memories updated"),
+        ],
+    )
+    manager = MemoryManager(model=model)
+
+    manager.create_or_update_memories(
+        messages=[Message(role="user", content="My name is John Doe")],
+        existing_memories=[],
+        user_id="test_user",
+        db=V1MemoryDb(),
+    )
+
+    assert model.response_formats == [None, None]
+    # The original model keeps its response format
+    assert model.response_format == {"type": "json_object"}
+
+
+def test_create_or_update_memories(model, mock_db):
+    manager = MemoryManager(model=model)
+
+    response = manager.create_or_update_memories(
+        messages=[Message(role="user", content="My name is John Doe")],
+        existing_memories=[],
+        user_id="test_user",
+        db=mock_db,
+    )
+
+    assert response == "Memories updated"
+    assert manager.memories_updated is True
+    # The memory is written once the model response is complete
+    assert mock_db.upsert_memory.call_count == 0
+    assert mock_db.upsert_memories.call_count == 1
+    (memory_row,) = mock_db.upsert_memories.call_args[0][0]
+    assert memory_row.user_id == "test_user"
+    assert memory_row.memory["memory"] == "The user's name is John Doe"
+    assert memory_row.memory["topics"] == ["name"]
+    assert memory_row.memory["input"] == "My name is John Doe"
+    # The manager's model is never given the memory tools
+    assert model._tools is None
+    assert model._functions is None
+
+
+async def test_arun_memory_task(model, mock_db):
+    manager = MemoryManager(model=model)
+
+    response = await manager.arun_memory_task(
+        task="Remember that my name is John Doe",
+        existing_memories=[],
+        user_id="test_user",
+        db=mock_db,
+    )
+
+    assert response == "Memories updated"
+    assert manager.memories_updated is True
+    assert mock_db.upsert_memories.call_count == 1
+    assert model._tools is None
+
+
+def test_get_static_system_message_tool_instructions():
+    manager = MemoryManager()
+
+    system_message = manager.get_static_system_message(enable_delete_memory=False, enable_clear_memory=True)
+
+    assert "`add_memory`" in system_message.content
+    assert "`update_memory`" in system_message.content
+    assert "`delete_memory`" not in system_message.content
+    assert "`clear_memory`" in system_message.content
+
+
+def test_get_memories_message_existing_memories():
+    manager = MemoryManager()
+
+    memories_message = manager.get_memories_message(
+        existing_memories=[{"memory_id": "2", "memory": "Lives in Paris"}, {"memory_id": "1", "memory": "Likes tea"}]
+    )
+
+    assert memories_message is not None
+    assert memories_message.role == "system"
+    # Memories are sorted by id so the message is deterministic
+    assert (
+        memories_message.content
+        == "<existing_memories>\nID: 1\nMemory: Likes tea\n\nID: 2\nMemory: Lives in Paris\n\n</existing_memories>"
+    )
+
+
+def test_get_memories_message_empty():
+    manager = MemoryManager()
+
+    assert manager.get_memories_message(existing_memories=[], messages=None) is None
+
+
+async def test_acreate_or_update_memories(model, mock_db):
+    manager = MemoryManager(model=model)
+
+    response = await manager.acreate_or_update_memories(
+        messages=[Message(role="user", content="My name is John Doe")],
+        existing_memories=[],
+        user_id="test_user",
+        db=mock_db,
+    )
+
+    assert response == "Memories updated"
+    assert manager.memories_updated is True
+    assert mock_db.upsert_memories.call_count == 1
+    # Only the add and update tools are available, so the prompt should not offer delete or clear
+    system_message = model.invocations[0][0]
+    assert "`delete_memory`" not in system_message.content
+    assert "`clear_memory`" not in system_message.content
+
+
+def test_create_or_update_memories_batch(mock_db):
+    model = MockModel(
+        responses=[
+            tool_call_response(
+                {"name": "add_memory", "arguments": {"row_id": "0", "memory": "Alice likes tea", "topics": None}},
+                {
+                    "name": "update_memory",
+                    "arguments": {"row_id": "1", "memory_id": "m2", "memory": "Bob lives in Rome", "topics": None},
+                },
+                {
+                    "name": "update_memory",
+                    "arguments": {"row_id": "1", "memory_id": "m1", "memory": "Alice lives in Rome", "topics": None},
+                },
+            ),
+            ModelResponse(role="assistant", content="Memories updated"),
+        ]
+    )
+    manager = MemoryManager(model=model)
+    tasks = [
+        MemoryUpdateTask(
+            messages=[Message(role="user", content="I like tea")],
+            existing_memories=[{"memory_id": "m1", "memory": "Alice lives in Paris"}],
+            user_id="alice",
+            db=mock_db,
+        ),
+        MemoryUpdateTask(
+            messages=[Message(role="user", content="I moved to Rome")],
+            existing_memories=[{"memory_id": "m2", "memory": "Bob lives in Paris"}],
+            user_id="bob",
+            db=mock_db,
+        ),
+    ]
+
+    responses = manager.create_or_update_memories_batch(tasks)
+
+    assert responses == ["Memories updated", "Memories updated"]
+    assert len(model.invocations) == 2
+    rows_message = model.invocations[0][1]
+    assert '<row row_id="0">' in rows_message.content
+    assert '<row row_id="1">' in rows_message.content
+    # The update of a memory from another row is rejected, and each row is written with one call
+    assert mock_db.upsert_memories.call_count == 2
+    rows = [row for call in mock_db.upsert_memories.call_args_list for row in call[0][0]]
+    assert len(rows) == 2
+    assert rows[0].user_id == "alice"
+    assert rows[0].memory["input"] == "I like tea"
+    assert rows[1].user_id == "bob"
+    assert rows[1].id == "m2"
+
+
+def test_create_or_update_memories_batch_size(mock_db):
+    model = MockModel()
+    manager = MemoryManager(model=model)
+    tasks = [
+        MemoryUpdateTask(
+            messages=[Message(role="user", content=f"Message {i}")],
+            existing_memories=[],
+            user_id=f"user_{i}",
+            db=mock_db,
+        )
+        for i in range(5)
+    ]
+
+    responses = manager.create_or_update_memories_batch(tasks, batch_size=2)
+
+    assert len(responses) == 5
+    assert len(model.invocations) == 3
+
+
+@pytest.mark.parametrize("batch_size", [0, -1])
+def test_create_or_update_memories_batch_size_is_at_least_one(mock_db, batch_size):
+    model = MockModel()
+    manager = MemoryManager(model=model)
+    tasks = [
+        MemoryUpdateTask(
+            messages=[Message(role="user", content=f"Message {i}")],
+            existing_memories=[],
+            user_id=f"user_{i}",
+            db=mock_db,
+        )
+        for i in range(3)
+    ]
+
+    responses = manager.create_or_update_memories_batch(tasks, batch_size=batch_size)
+
+    assert len(responses) == 3
+    assert len(model.invocations) == 3
+
+
+async def test_acreate_or_update_memories_many(mock_db, monkeypatch):
+    monkeypatch.setenv("AGNO_MEMORY_CONCURRENCY", "2")
+    model = MockModel()
+    manager = MemoryManager(model=model)
+    tasks = [
+        MemoryUpdateTask(
+            messages=[Message(role="user", content=f"Message {i}")],
+            existing_memories=[],
+            user_id=f"user_{i}",
+            db=mock_db,
+        )
+        for i in range(3)
+    ]
+
+    responses = await manager.acreate_or_update_memories_many(tasks)
+
+    assert responses == ["Done", "Done", "Done"]
+    assert len(model.invocations) == 3
+
+
+def test_cached_tools_are_bound_to_each_run(mock_db):
+    add_memory_call = {"name": "add_memory", "arguments": {"memory": "Likes tea", "topics": None}}
+    model = MockModel(
+        responses=[
+            tool_call_response(add_memory_call),
+            ModelResponse(role="assistant", content="Done"),
+            tool_call_response(add_memory_call),
+            ModelResponse(role="assistant", content="Done"),
+        ]
+    )
+    manager = MemoryManager(model=model)
+
+    for user_id in ["alice", "bob"]:
+        manager.create_or_update_memories(
+            messages=[Message(role="user", content="I like tea")], existing_memories=[], user_id=user_id, db=mock_db
+        )
+
+    assert [call[0][0][0].user_id for call in mock_db.upsert_memories.call_args_list] == ["alice", "bob"]
+
+
+def test_cached_batch_tools_do_not_keep_the_batch_alive(mock_db):
+    add_memory_call = {"name": "add_memory", "arguments": {"row_id": "0", "memory": "Likes tea", "topics": None}}
+    model = MockModel(
+        responses=[
+            tool_call_response(add_memory_call),
+            ModelResponse(role="assistant", content="Done"),
+            tool_call_response(add_memory_call),
+            ModelResponse(role="assistant", content="Done"),
+        ]
+    )
+    manager = MemoryManager(model=model)
+    batch_tools = manager._get_batch_db_tools({}, {})
+    for tool in batch_tools:
+        _TOOL_CACHE.pop(tool.__code__, None)
+
+    for user_id in ["alice", "bob"]:
+        manager.create_or_update_memories_batch(
+            [
+                MemoryUpdateTask(
+                    messages=[Message(role="user", content="I like tea")],
+                    existing_memories=[],
+                    user_id=user_id,
+                    db=mock_db,
+                )
+            ]
+        )
+
+    assert [call[0][0][0].user_id for call in mock_db.upsert_memories.call_args_list] == ["alice", "bob"]
+    for tool in batch_tools:
+        assert _TOOL_CACHE[tool.__code__].entrypoint is None
+
+
+async def test_concurrent_runs_write_to_their_own_user(mock_db):
+    @dataclass
+    class AddMemoryModel(MockModel):
+        def invoke(self, *args, **kwargs) -> Any:
+            if kwargs["messages"][-1].role == "tool":
+                return ModelResponse(role="assistant", content="Done")
+            return tool_call_response({"name": "add_memory", "arguments": {"memory": "Likes tea", "topics": None}})
+
+    manager = MemoryManager(model=AddMemoryModel())
+    tasks = [
+        MemoryUpdateTask(
+            messages=[Message(role="user", content=f"Message from user_{i}")],
+            existing_memories=[],
+            user_id=f"user_{i}",
+            db=mock_db,
+        )
+        for i in range(3)
+    ]
+
+    await manager.acreate_or_update_memories_many(tasks)
+
+    rows = [call[0][0][0] for call in mock_db.upsert_memories.call_args_list]
+    assert len(rows) == 3
+    for row in rows:
+        assert row.memory["input"] == f"Message from {row.user_id}"
+
+
+def test_input_string_from_multiple_messages():
+    manager = MemoryManager()
+
+    input_string = manager._get_input_string(
+        [
+            Message(role="user", content="I like tea"),
+            Message(role="assistant", content="Noted"),
+            Message(role="user", content="I live in Paris"),
+        ]
+    )
+
+    assert input_string == "[I like tea, I live in Paris]"
+
+
+@pytest.mark.parametrize("requires_user_message", [True, False])
+def test_create_or_update_memories_user_message(mock_db, requires_user_message):
+    model = MockModel(requires_user_message=requires_user_message)
+    manager = MemoryManager(model=model)
+
+    manager.create_or_update_memories(
+        messages=[Message(role="user", content="My name is John Doe")],
+        existing_memories=[],
+        user_id="test_user",
+        db=mock_db,
+    )
+
+    roles = [message.role for message in model.invocations[0]]
+    assert roles == (["system", "system", "user"] if requires_user_message else ["system", "system"])
+    # The static instructions do not depend on the run
+    assert "My name is John Doe" not in model.invocations[0][0].content
+    assert "My name is John Doe" in model.invocations[0][1].content
+
+
+def test_memory_tools_are_built_at_import():
+    from agno.memory.v2.manager import _TOOL_CACHE, add_memory, clear_memory, delete_memory, update_memory
+
+    for tool in (add_memory, update_memory, delete_memory, clear_memory):
+        assert tool.__code__ in _TOOL_CACHE
+
+
+def test_create_or_update_memories_structured_outputs(mock_db):
+    model = MockModel(
+        responses=[
+            ModelResponse(
+                role="assistant",
+                content=json.dumps(
+                    {
+                        "add": [{"memory": "Likes tea", "topics": ["preferences"]}],
+                        "update": [
+                            {"memory_id": "m1", "memory": "Lives in Rome", "topics": None},
+                            {"memory_id": "other", "memory": "Not this user's memory", "topics": None},
+                        ],
+                    }
+                ),
+            )
+        ]
+    )
+    manager = MemoryManager(model=model, use_structured_outputs=True)
+
+    manager.create_or_update_memories(
+        messages=[Message(role="user", content="I like tea and moved to Rome")],
+        existing_memories=[{"memory_id": "m1", "memory": "Lives in Paris"}],
+        user_id="test_user",
+        db=mock_db,
+    )
+
+    # One model call without tools, and a single write for all memories
+    assert len(model.invocations) == 1
+    assert "`add`" in model.invocations[0][0].content
+    assert model._tools is None
+    assert model.response_format is None
+    assert mock_db.upsert_memory.call_count == 0
+    assert mock_db.upsert_memories.call_count == 1
+    rows = mock_db.upsert_memories.call_args[0][0]
+    assert [row.memory["memory"] for row in rows] == ["Likes tea", "Lives in Rome"]
+    assert rows[1].id == "m1"
+    assert all(row.user_id == "test_user" for row in rows)
+    assert manager.memories_updated is True
+
+
+def test_memory_tool_writes_are_flushed_after_response(mock_db):
+    model = MockModel(
+        responses=[
+            tool_call_response(
+                {"name": "add_memory", "arguments": {"memory": "Likes tea", "topics": None}},
+                {"name": "update_memory", "arguments": {"memory_id": "m1", "memory": "Likes coffee", "topics": None}},
+                {"name": "delete_memory", "arguments": {"memory_id": "m1"}},
+                {"name": "delete_memory", "arguments": {"memory_id": "m2"}},
+            ),
+            ModelResponse(role="assistant", content="Done"),
+        ]
+    )
+    manager = MemoryManager(model=model)
+
+    manager.run_memory_task(
+        task="I like tea, forget everything else",
+        existing_memories=[{"memory_id": "m1", "memory": "Likes coffee"}, {"memory_id": "m2", "memory": "Likes juice"}],
+        user_id="test_user",
+        db=mock_db,
+    )
+
+    # The update of m1 is dropped because m1 is deleted afterwards
+    mock_db.delete_memory.assert_not_called()
+    mock_db.delete_memories.assert_called_once_with(["m1", "m2"])
+    (memory_row,) = mock_db.upsert_memories.call_args[0][0]
+    assert memory_row.memory["memory"] == "Likes tea"
+
+
+def test_clear_memory_drops_earlier_writes(mock_db):
+    model = MockModel(
+        responses=[
+            tool_call_response(
+                {"name": "add_memory", "arguments": {"memory": "Likes tea", "topics": None}},
+                {"name": "clear_memory", "arguments": {}},
+                {"name": "add_memory", "arguments": {"memory": "Likes coffee", "topics": None}},
+            ),
+            ModelResponse(role="assistant", content="Done"),
+        ]
+    )
+    manager = MemoryManager(model=model)
+
+    manager.run_memory_task(task="Start over, I like coffee", existing_memories=[], user_id="test_user", db=mock_db)
+
+    mock_db.clear.assert_called_once()
+    mock_db.delete_memories.assert_not_called()
+    (memory_row,) = mock_db.upsert_memories.call_args[0][0]
+    assert memory_row.memory["memory"] == "Likes coffee"
+
+
+@pytest.mark.parametrize("topics", [None, ["preferences"]])
+def test_build_memory_row_matches_user_memory(topics):
+    from datetime import datetime
+
+    from agno.memory.v2.manager import _build_memory_row
+    from agno.memory.v2.schema import UserMemory
+
+    last_updated = datetime.now()
+
+    memory_row = _build_memory_row("m1", "Likes tea", topics, last_updated, "test_user", "I like tea")
+
+    expected = UserMemory(
+        memory_id="m1", memory="Likes tea", topics=topics, last_updated=last_updated, input="I like tea"
+    ).to_dict()
+    assert memory_row.memory == expected
+    assert list(memory_row.memory) == list(expected)
+    assert memory_row.id == "m1"
+    assert memory_row.user_id == "test_user"
+    assert memory_row.last_updated == last_updated
+
+
+def test_response_stream_with_tools_does_not_modify_model(model):
+    function = Mock()
+    function.name = "tool"
+
+    responses = list(
+        model.response_stream(
+            messages=[Message(role="user", content="Hello")],
+            tools=[{"type": "function", "function": {"name": "tool"}}],
+            functions={"tool": function},
+        )
+    )
+
+    assert len(responses) > 0
+    assert model._tools is None
+    assert model._functions is None
+
+
+def test_memories_are_written_while_the_model_continues(mock_db):
+    import threading
+
+    written = threading.Event()
+    mock_db.upsert_memories.side_effect = lambda rows: written.set()
+    written_before_final_turn = []
+
+    @dataclass
+    class WaitingModel(MockModel):
+        def invoke(self, *args, **kwargs) -> Any:
+            if kwargs["messages"][-1].role == "tool":
+                # The changes of the first round are flushed in the background while the model generates
+                written_before_final_turn.append(written.wait(timeout=5))
+                return ModelResponse(role="assistant", content="Done")
+            return tool_call_response({"name": "add_memory", "arguments": {"memory": "Likes tea", "topics": None}})
+
+    manager = MemoryManager(model=WaitingModel(), stream_memory_updates=True)
+
+    response = manager.create_or_update_memories(
+        messages=[Message(role="user", content="I like tea")], existing_memories=[], user_id="test_user", db=mock_db
+    )
+
+    assert response == "Done"
+    assert written_before_final_turn == [True]
+    assert mock_db.upsert_memories.call_count == 1
+
+
+@pytest.mark.parametrize("stream_memory_updates", [False, True])
+async def test_create_or_update_memories_in_memory_sqlite(stream_memory_updates):
+    from agno.memory.v2.db.sqlite import SqliteMemoryDb
+
+    def make_model():
+        return MockModel(
+            responses=[
+                tool_call_response({"name": "add_memory", "arguments": {"memory": "Likes tea", "topics": None}}),
+                ModelResponse(role="assistant", content="Done"),
+            ]
+        )
+
+    # Every thread has its own in-memory database, so the memories must be written on the caller's thread
+    db = SqliteMemoryDb()
+    assert db.supports_threaded_writes() is False
+    messages = [Message(role="user", content="I like tea")]
+
+    MemoryManager(model=make_model(), stream_memory_updates=stream_memory_updates).create_or_update_memories(
+        messages=messages, existing_memories=[], user_id="alice", db=db
+    )
+    await MemoryManager(model=make_model(), stream_memory_updates=stream_memory_updates).acreate_or_update_memories(
+        messages=messages, existing_memories=[], user_id="bob", db=db
+    )
+
+    assert sorted(memory.user_id for memory in db.read_memories()) == ["alice", "bob"]
+
+
+def test_create_or_update_memories_does_not_stream_by_default(model, mock_db):
+    model.response_stream = Mock(side_effect=AssertionError("response_stream should not be called"))
+    manager = MemoryManager(model=model)
+
+    response = manager.create_or_update_memories(
+        messages=[Message(role="user", content="I like tea")], existing_memories=[], user_id="test_user", db=mock_db
+    )
+
+    assert response == "Memories updated"
+    assert mock_db.upsert_memories.call_count == 1
+
+
+async def test_astream_error_still_writes_memories(mock_db):
+    @dataclass
+    class FailingModel(MockModel):
+        def invoke(self, *args, **kwargs) -> Any:
+            if kwargs["messages"][-1].role == "tool":
+                raise RuntimeError("Model failed")
+            return tool_call_response({"name": "add_memory", "arguments": {"memory": "Likes tea", "topics": None}})
+
+    manager = MemoryManager(model=FailingModel(), stream_memory_updates=True)
+
+    with pytest.raises(RuntimeError):
+        await manager.acreate_or_update_memories(
+            messages=[Message(role="user", content="I like tea")], existing_memories=[], user_id="test_user", db=mock_db
+        )
+
+    # The changes made before the error are written, and no flush is left running
+    assert mock_db.upsert_memories.call_count == 1
+    assert [task for task in asyncio.all_tasks() if task is not asyncio.current_task()] == []
+
+
+def test_get_system_message_combines_instructions_and_memories():
+    manager = MemoryManager()
+
+    system_message = manager.get_system_message(
+        existing_memories=[{"memory_id": "1", "memory": "Likes tea"}],
+        messages=[Message(role="user", content="I live in Paris")],
+        enable_delete_memory=False,
+        enable_clear_memory=False,
+    )
+
+    assert system_message.role == "system"
+    assert system_message.content.startswith(manager.get_static_system_message(False, False).content)
+    assert "<user_messages>\nI live in Paris\n</user_messages>" in system_message.content
+    assert "ID: 1\nMemory: Likes tea" in system_message.content
+
+
+def test_overridden_get_system_message_is_used(model, mock_db):
+    class CustomMemoryManager(MemoryManager):
+        def get_system_message(self, existing_memories=None, messages=None, **kwargs) -> Message:
+            return Message(role="system", content="Custom memory prompt")
+
+    manager = CustomMemoryManager(model=model)
+
+    manager.create_or_update_memories(
+        messages=[Message(role="user", content="My name is John Doe")],
+        existing_memories=[],
+        user_id="test_user",
+        db=mock_db,
+    )
+
+    assert [message.content for message in model.invocations[0] if message.role == "system"] == ["Custom memory prompt"]
+
+
+@pytest.mark.parametrize("value, expected", [(None, 8), ("3", 3), ("many", 8)])
+def test_get_memory_concurrency(monkeypatch, value, expected):
+    from agno.memory.v2.manager import _get_memory_concurrency
+
+    if value is None:
+        monkeypatch.delenv("AGNO_MEMORY_CONCURRENCY", raising=False)
+    else:
+        monkeypatch.setenv("AGNO_MEMORY_CONCURRENCY", value)
+
+    assert _get_memory_concurrency() == expected
+
+
+def test_create_or_update_memories_with_v1_db(model):
+    db = V1MemoryDb()
+    manager = MemoryManager(model=model)
+
+    manager.create_or_update_memories(
+        messages=[Message(role="user", content="My name is John Doe")], existing_memories=[], user_id="test_user", db=db
+    )
+
+    assert [row.memory["memory"] for row in db.rows.values()] == ["The user's name is John Doe"]
+
+
+def test_failed_bulk_write_is_retried_per_memory(mock_db):
+    from agno.memory.v2.db.schema import MemoryRow
+    from agno.memory.v2.manager import _upsert_memories
+
+    mock_db.upsert_memories.side_effect = RuntimeError("Bulk write failed")
+    mock_db.upsert_memory.side_effect = [None, RuntimeError("Bad memory")]
+    memories = [MemoryRow(id="m1", memory={"memory": "Likes tea"}), MemoryRow(id="m2", memory={"memory": "Bad"})]
+
+    assert _upsert_memories(mock_db, memories) is False
+    assert [call[0][0].id for call in mock_db.upsert_memory.call_args_list] == ["m1", "m2"]
+
+
+@pytest.mark.parametrize("stream_memory_updates", [False, True])
+async def test_acreate_or_update_memories_with_v1_db(model, stream_memory_updates):
+    db = V1MemoryDb()
+    manager = MemoryManager(model=model, stream_memory_updates=stream_memory_updates)
+
+    await manager.acreate_or_update_memories(
+        messages=[Message(role="user", content="My name is John Doe")], existing_memories=[], user_id="test_user", db=db
+    )
+
+    assert [row.memory["memory"] for row in db.rows.values()] == ["The user's name is John Doe"]
+
+
+async def test_arun_memory_task_with_v1_db(model):
+    db = V1MemoryDb()
+    manager = MemoryManager(model=model)
+
+    await manager.arun_memory_task(task="My name is John Doe", existing_memories=[], user_id="test_user", db=db)
+
+    assert len(db.rows) == 1
+
+
+async def test_structured_outputs_db_error_is_logged(mock_db):
+    def make_model():
+        return MockModel(
+            responses=[ModelResponse(role="assistant", content=json.dumps({"add": [{"memory": "Likes tea"}]}))]
+        )
+
+    mock_db.upsert_memories.side_effect = RuntimeError("Database is down")
+    mock_db.upsert_memory.side_effect = RuntimeError("Database is down")
+    messages = [Message(role="user", content="I like tea")]
+
+    manager = MemoryManager(model=make_model(), use_structured_outputs=True)
+    manager.create_or_update_memories(messages=messages, existing_memories=[], user_id="test_user", db=mock_db)
+    amanager = MemoryManager(model=make_model(), use_structured_outputs=True)
+    await amanager.acreate_or_update_memories(messages=messages, existing_memories=[], user_id="test_user", db=mock_db)
+
+    assert manager.memories_updated is False
+    assert amanager.memories_updated is False
@@ -0,0 +1,36 @@
+from agno.models.message import Message
+
+
+def test_get_content_string_from_str():
+    message = Message(role="user", content="Hello")
+
+    assert message.get_content_string() == "Hello"
+
+
+def test_get_content_string_from_text_parts():
+    message = Message(role="user", content=[{"type": "text", "text": "Hello"}])
+
+    assert message.get_content_string() == "Hello"
+
+
+def test_get_content_string_is_updated_when_content_changes():
+    message = Message(role="user", content=[{"type": "image_url", "image_url": "https://example.com/image.png"}])
+    assert message.get_content_string() == '[{"type": "image_url", "image_url": "https://example.com/image.png"}]'
+
+    message.content = [{"type": "image_url", "image_url": "https://example.com/other.png"}]
+    assert message.get_content_string() == '[{"type": "image_url", "image_url": "https://example.com/other.png"}]'
+
+    message.content = "Hello"
+    assert message.get_content_string() == "Hello"
+
+
+def test_get_content_string_is_updated_when_content_is_edited_in_place():
+    message = Message(role="user", content=[{"type": "image_url", "image_url": "https://example.com/image.png"}])
+    assert message.get_content_string() == '[{"type": "image_url", "image_url": "https://example.com/image.png"}]'
+
+    message.content.append({"type": "image_url", "image_url": "https://example.com/other.png"})
+
+    assert message.get_content_string() == (
+        '[{"type": "image_url", "image_url": "https://example.com/image.png"}, '
+        '{"type": "image_url", "image_url": "https://example.com/other.png"}]'
+    )